@@ -268,6 +268,9 @@ def restartUnsafely():
 	options = []
 	if NVDAState.isRunningAsSource():
 		options.append(os.path.basename(sys.argv[0]))
+	# The new instance moves the log file aside when it starts,
+	# and exit code which would otherwise write pending log records may not run.
+	logHandler.flushLogFile()
 	_startNewInstance(
 		NewNVDAInstance(
 			sys.executable,
@@ -361,6 +364,7 @@ def resetConfiguration(factoryDefaults=False):
 	log.debug("Reloading config")
 	config.conf.reset(factoryDefaults=factoryDefaults)
 	logHandler.setLogLevelFromConfig()
+	logHandler.updateExternalDependencyLoggingFromConfig()
 	# Language
 	if languageHandler.isLanguageForced():
 		lang = globalVars.appArgs.language
@@ -710,6 +714,8 @@ def main():
 		WritePaths.configDir = config.getUserDefaultConfigPath(
 			useInstalledPathIfExists=globalVars.appArgs.launcher,
 		)
+	# Code paths classified before the config directory was known must be reclassified.
+	logHandler._resetPathCaches()
 	# Initialize the config path (make sure it exists)
 	config.initConfigPath()
 	log.info(f"Config dir: {WritePaths.configDir}")
@@ -717,6 +723,8 @@ def main():
 	import config
 
 	config.initialize()
+	logHandler.updateExternalDependencyLoggingFromConfig()
+	config.post_configProfileSwitch.register(logHandler.updateExternalDependencyLoggingFromConfig)
 	if config.conf["development"]["enableScratchpadDir"]:
 		log.info("Developer Scratchpad mode enabled")
 	if languageHandler.isLanguageForced():
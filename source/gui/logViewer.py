@@ -7,6 +7,7 @@
 
 import wx
 import globalVars
+import logHandler
 import gui
 import gui.contextHelp
 from gui import blockAction
@@ -71,6 +72,8 @@ def refresh(self, evt=None):
 		if globalVars.appArgs.logFileName is None:
 			return
 		pos = self.outputCtrl.GetInsertionPoint()
+		# Ensure records which are still pending are written to the log file before reading it.
+		logHandler.flushLogFile()
 		# Append new text to the output control which has been written to the log file since the last refresh.
 		try:
 			f = open(globalVars.appArgs.logFileName, "r", encoding="UTF-8")
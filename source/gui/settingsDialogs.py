@@ -4883,6 +4883,7 @@ def onSave(self):
 
 		for index, key in enumerate(self.logCategories):
 			config.conf["debugLog"][key] = self.logCategoriesList.IsChecked(index)
+		logHandler.updateExternalDependencyLoggingFromConfig()
 		config.conf["featureFlag"]["playErrorSound"] = self.playErrorSoundCombo.GetSelection()
 		config.conf["virtualBuffers"]["textParagraphRegex"] = self.textParagraphRegexEdit.GetValue()
 
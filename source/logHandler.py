@@ -6,16 +6,22 @@
 
 """Utilities and classes to manage logging in NVDA"""
 
+import atexit
+import contextlib
 import os
 import ctypes
+import functools
+import queue
 import sys
 import threading
+import time
 import warnings
 import logging
+import logging.handlers
 import inspect
 import winsound
 import traceback
-from types import FunctionType, TracebackType
+from types import CodeType, FrameType, FunctionType, TracebackType
 import globalVars
 import winBindings.kernel32
 import winKernel
@@ -49,6 +55,14 @@
 We cannot use `globalVars.appDir`, since for binary builds it points to the directory with NVDA binaries,
 whereas for compiled versions NVDA's code files are in `library.zip`.
 """
+_STACK_INFO_LIMIT = 25
+"""Maximum number of frames included when a log call requests `stack_info=True`."""
+_TRACEBACK_LIMIT = 50
+"""Maximum number of frames included in each traceback of a logged exception."""
+_LOG_FILE_BUFFER_SIZE = 64 * 1024
+"""Size in bytes of the write buffer of the log file."""
+_FLUSH_TIMEOUT = 5.0
+"""Maximum time in seconds to wait for pending records to be written when flushing the log file."""
 
 
 def getFormattedStacksForAllThreads() -> str:
@@ -58,23 +72,50 @@ def getFormattedStacksForAllThreads() -> str:
 	"""
 	# First collect the names of all threads that have actually been started by Python itself.
 	threadNamesByID = {x.ident: x.name for x in threading.enumerate()}
+	# Extract every stack before formatting any of them, so that the stacks are captured as close together as possible.
+	# Source lines are only read afterwards, when the stacks are formatted.
+	stackSummariesByID: dict[int, traceback.StackSummary] = {}
+	for ident, frame in sys._current_frames().items():
+		stackSummary = traceback.StackSummary.extract(traceback.walk_stack(frame), lookup_lines=False)
+		# walk_stack starts from the innermost frame, but stacks are listed outermost first.
+		stackSummary.reverse()
+		stackSummariesByID[ident] = stackSummary
 	stacks = []
 	# If a Python function is entered by a thread that was not started by Python itself,
 	# It will have a frame, but won't be tracked by Python's threading module and therefore will have no name.
-	for ident, frame in sys._current_frames().items():
+	for ident, stackSummary in stackSummariesByID.items():
 		# The strings in the formatted stack all end with \n, so no join separator is necessary.
-		stack = "".join(traceback.format_stack(frame))
+		stack = "".join(stackSummary.format())
 		name = threadNamesByID.get(ident, "Unknown")
 		stacks.append(f"Python stack for thread {ident} ({name}):\n{stack}")
 	return "\n".join(stacks)
 
 
+_NVDA_CODE_PATH_PREFIX = _NVDA_CODE_PATH + "\\"
+_isPathExternalCache: dict[str, bool] = {}
+"""Caches the result of L{isPathExternalToNVDA} by path, as it is computed for every log call."""
+
+
+def _resetPathCaches() -> None:
+	"""Clears cached path classifications.
+	Must be called when `WritePaths.configDir` changes.
+	"""
+	_isPathExternalCache.clear()
+
+
 def isPathExternalToNVDA(path: str) -> bool:
 	"""Checks if the given path is external to NVDA (I.e. not pointing to built-in code)."""
+	isExternal = _isPathExternalCache.get(path)
+	if isExternal is None:
+		isExternal = _isPathExternalCache[path] = _isPathExternalToNVDA(path)
+	return isExternal
+
+
+def _isPathExternalToNVDA(path: str) -> bool:
 	if (
 		path[0] != "<"
 		and os.path.isabs(path)
-		and not os.path.normpath(path).startswith(_NVDA_CODE_PATH + "\\")
+		and not os.path.normpath(path).startswith(_NVDA_CODE_PATH_PREFIX)
 		or (
 			# Handle messages logged before config is initialized
 			WritePaths.configDir is not None and path.startswith(WritePaths.configDir)
@@ -90,14 +131,51 @@ def isPathExternalToNVDA(path: str) -> bool:
 	return False
 
 
-def getCodePath(f):
+@functools.lru_cache(maxsize=4096)
+def _getDefiningClassName(code: CodeType, topCls: type) -> str:
+	"""Finds the deepest class in the MRO of `topCls` which defines `code`
+	as a method, class method or property accessor.
+	This is computed for every log call, so results are cached.
+	:param code: The code object of the logging function.
+	:param topCls: The class (or type of the instance) passed as the first argument to the function.
+	:return: The name of the defining class, or an empty string if `code` is not a member of `topCls`.
+	"""
+	funcName = code.co_name
+	# find the deepest class this function's name is reachable as a method from
+	if not hasattr(topCls, funcName):
+		return ""
+	for cls in topCls.__mro__:
+		member = cls.__dict__.get(funcName)
+		if not member:
+			continue
+		memberType = type(member)
+		if memberType is FunctionType and member.__code__ is code:
+			# the function was found as a standard method
+			return cls.__name__
+		elif (
+			memberType is classmethod
+			and type(member.__func__) is FunctionType
+			and member.__func__.__code__ is code
+		):
+			# function was found as a class method
+			return cls.__name__
+		elif memberType is property:
+			if type(member.fget) is FunctionType and member.fget.__code__ is code:
+				# The function was found as a property getter
+				return cls.__name__
+			elif type(member.fset) is FunctionType and member.fset.__code__ is code:
+				# the function was found as a property setter
+				return cls.__name__
+	return ""
+
+
+def getCodePath(f: FrameType) -> str:
 	"""Using a frame object, gets its module path (relative to the current directory).[className.[funcName]]
 	@param f: the frame object to use
-	@type f: frame
 	@returns: the dotted module.class.attribute path
-	@rtype: string
 	"""
-	fn = f.f_code.co_filename
+	code = f.f_code
+	fn = code.co_filename
 	if isPathExternalToNVDA(fn):
 		path = "external:"
 	else:
@@ -106,15 +184,15 @@ def getCodePath(f):
 		path += f.f_globals["__name__"]
 	except KeyError:
 		path += fn
-	funcName = f.f_code.co_name
+	funcName = code.co_name
 	if funcName.startswith("<"):
 		funcName = ""
 	className = ""
 	# Code borrowed from http://mail.python.org/pipermail/python-list/2000-January/020141.html
-	if f.f_code.co_argcount:
+	if code.co_argcount:
 		f_locals = f.f_locals
-		arg0 = f_locals[f.f_code.co_varnames[0]]
-		if f.f_code.co_flags & inspect.CO_NEWLOCALS:
+		arg0 = f_locals[code.co_varnames[0]]
+		if code.co_flags & inspect.CO_NEWLOCALS:
 			# Fetching of Frame.f_locals causes a function frames's locals to be cached on the frame for ever.
 			# If an Exception is currently stored as a local variable on that frame,
 			# A reference cycle will be created, holding the frame and all its variables.
@@ -132,32 +210,7 @@ def getCodePath(f):
 		# This stops infinite recursions if fetching data descriptors,
 		# And better reflects the actual source code definition.
 		topCls = arg0 if isinstance(arg0, type) else type(arg0)
-		# find the deepest class this function's name is reachable as a method from
-		if hasattr(topCls, funcName):
-			for cls in topCls.__mro__:
-				member = cls.__dict__.get(funcName)
-				if not member:
-					continue
-				memberType = type(member)
-				if memberType is FunctionType and member.__code__ is f.f_code:
-					# the function was found as a standard method
-					className = cls.__name__
-				elif (
-					memberType is classmethod
-					and type(member.__func__) is FunctionType
-					and member.__func__.__code__ is f.f_code
-				):
-					# function was found as a class method
-					className = cls.__name__
-				elif memberType is property:
-					if type(member.fget) is FunctionType and member.fget.__code__ is f.f_code:
-						# The function was found as a property getter
-						className = cls.__name__
-					elif type(member.fset) is FunctionType and member.fset.__code__ is f.f_code:
-						# the function was found as a property setter
-						className = cls.__name__
-				if className:
-					break
+		className = _getDefiningClassName(code, topCls)
 	return ".".join(x for x in (path, className, funcName) if x)
 
 
@@ -204,11 +257,13 @@ def shouldPlayErrorSound() -> bool:
 
 # Function to strip the base path of our code from traceback text to improve readability.
 if NVDAState.isRunningAsSource():
-	BASE_PATH = os.path.split(__file__)[0] + os.sep
+	BASE_PATH = _NVDA_CODE_PATH_PREFIX
 	TB_BASE_PATH_PREFIX = '  File "'
 	TB_BASE_PATH_MATCH = TB_BASE_PATH_PREFIX + BASE_PATH
 
-	def stripBasePathFromTracebackText(text):
+	def stripBasePathFromTracebackText(text: str) -> str:
+		# No membership test is needed first:
+		# str.replace returns the original string without copying it when there is no match.
 		return text.replace(TB_BASE_PATH_MATCH, TB_BASE_PATH_PREFIX)
 else:
 
@@ -216,8 +271,49 @@ def stripBasePathFromTracebackText(text: str) -> str:
 		return text
 
 
+_DEBUG_WARNING_WINERRORS = frozenset(
+	{
+		ERROR_INVALID_WINDOW_HANDLE,
+		ERROR_TIMEOUT,
+		RPCConstants.RPC.S_SERVER_UNAVAILABLE,
+		RPCConstants.RPC.S_CALL_FAILED_DNE,
+		EPT_S_NOT_REGISTERED,
+		RPCConstants.RPC.E_CALL_CANCELED,
+	},
+)
+"""Error codes of `WindowsError`s which are expected, and are therefore logged at level DEBUGWARNING by L{Logger.exception}."""
+_DEBUG_WARNING_HRESULTS = frozenset(
+	{
+		E_ACCESSDENIED,
+		CO_E_OBJNOTCONNECTED,
+		EVENT_E_ALL_SUBSCRIBERS_FAILED,
+		RPCConstants.RPC.E_CALL_REJECTED,
+		RPCConstants.RPC.E_CALL_CANCELED,
+		RPCConstants.RPC.E_DISCONNECTED,
+	},
+)
+"""HRESULTs of `COMError`s which are expected, and are therefore logged at level DEBUGWARNING by L{Logger.exception}."""
+
+
+@functools.cache
+def _getCOMErrorType() -> type[Exception]:
+	"""Returns `comtypes.COMError`.
+	comtypes is imported on first use rather than when this module is imported.
+	"""
+	from comtypes import COMError
+
+	return COMError
+
+
 _excInfo_t = tuple[type[BaseException] | None, BaseException | None, TracebackType | None]
 
+# Whether the singleton L{log} is enabled for the debug levels, checked before any other work by hot logging paths.
+# These are set from the levels of L{log} when this module is imported,
+# and kept up to date by L{_updateLevelFlags}.
+_isDebugEnabled = False
+_isIOEnabled = False
+_isDebugWarningEnabled = False
+
 
 class Logger(logging.Logger):
 	# Import standard levels for convenience.
@@ -245,7 +341,7 @@ def _log(
 		activateLogViewer: bool = False,
 		stack_info: list[traceback.FrameSummary] | bool | None = None,
 		redactSecrets: bool = False,
-	) -> Any:
+	) -> None:
 		"""Logs a message with the given severity level.
 
 		:param level: The severity level of the log message.
@@ -257,14 +353,18 @@ def _log(
 		:param activateLogViewer: Whether to activate the log viewer
 		:param stack_info: Stack information to be logged
 		:param redactSecrets: Whether to check for and redact secrets in the log message
-		:return: The result of the logging operation (None for builtin handlers).
 		"""
+		if level < self.WARNING and not _isExternalDependencyLoggingEnabled and self.name != NVDA_LOGGER_NAME:
+			# This record would be dropped by L{filterExternalDependencyLogging},
+			# so avoid computing its code path and creating it at all.
+			return
 
 		if not extra:
 			extra = {}
 
 		if not codepath or stack_info is True:
-			f = inspect.currentframe().f_back.f_back
+			# Skip this frame and the public logging method (e.g. `info`) which called it.
+			f = sys._getframe(2)
 
 		if not codepath:
 			codepath = getCodePath(f)
@@ -286,9 +386,11 @@ def _log(
 
 		if stack_info:
 			if stack_info is True:
-				stack_info = traceback.extract_stack(f)
+				stack_info = traceback.extract_stack(f, limit=_STACK_INFO_LIMIT)
+			elif not isinstance(stack_info, traceback.StackSummary):
+				stack_info = traceback.StackSummary.from_list(stack_info)
 			msg += "\nStack trace:\n" + stripBasePathFromTracebackText(
-				"".join(traceback.format_list(stack_info)).rstrip(),
+				"".join(stack_info.format()).rstrip(),
 			)
 
 		if redactSecrets and self.getEffectiveLevel() > self.DEBUG_UNREDACTED:
@@ -307,26 +409,77 @@ def _log(
 				for secret in list(scan_line(formattedMsg)):
 					formattedMsg = formattedMsg.replace(secret.secret_value, "****")
 
-			res = super()._log(level, formattedMsg, (), exc_info, extra)
-
-		else:
-			res = super()._log(level, msg, args, exc_info, extra)
+			msg = formattedMsg
+			args = ()
+
+		if exc_info:
+			if isinstance(exc_info, BaseException):
+				exc_info = (type(exc_info), exc_info, exc_info.__traceback__)
+			elif not isinstance(exc_info, tuple):
+				exc_info = sys.exc_info()
+		# The record is created directly rather than through `logging.Logger._log`,
+		# as NVDA identifies the origin of a record by its codepath,
+		# so looking up the caller's file, line number and function name would be wasted work.
+		# Like `logging.Logger.makeRecord`, honour any record factory installed with `logging.setLogRecordFactory`.
+		record = logging.getLogRecordFactory()(
+			self.name,
+			level,
+			"(unknown file)",
+			0,
+			msg,
+			args,
+			exc_info,
+			"(unknown function)",
+		)
+		recordDict = record.__dict__
+		for key, value in extra.items():
+			# As in `logging.Logger.makeRecord`, extra may not replace standard record attributes.
+			if key in ("message", "asctime") or key in recordDict:
+				raise KeyError(f"Attempt to overwrite {key!r} in LogRecord")
+			recordDict[key] = value
+		self.handle(record)
 
 		if activateLogViewer:
 			# Make the log text we just wrote appear in the log viewer.
 			logViewer.logViewer.refresh()
 
-		return res
+	def setLevel(self, level: int | str) -> None:
+		super().setLevel(level)
+		_updateLevelFlags()
+
+	@property
+	def isIOEnabled(self) -> bool:
+		"""Whether messages at level IO are logged.
+		Hot paths such as input and braille should check this before building IO messages.
+		"""
+		if self is log:
+			return _isIOEnabled
+		return self.isEnabledFor(self.IO)
+
+	def debug(self, msg, *args, **kwargs):
+		"""Log 'msg % args' with severity 'DEBUG'."""
+		if self is log:
+			if not _isDebugEnabled:
+				return
+		elif not self.isEnabledFor(self.DEBUG):
+			return
+		self._log(self.DEBUG, msg, args, **kwargs)
 
 	def debugWarning(self, msg, *args, **kwargs):
 		"""Log 'msg % args' with severity 'DEBUGWARNING'."""
-		if not self.isEnabledFor(self.DEBUGWARNING):
+		if self is log:
+			if not _isDebugWarningEnabled:
+				return
+		elif not self.isEnabledFor(self.DEBUGWARNING):
 			return
 		self._log(log.DEBUGWARNING, msg, args, **kwargs)
 
 	def io(self, msg, *args, **kwargs):
 		"""Log 'msg % args' with severity 'IO'."""
-		if not self.isEnabledFor(self.IO):
+		if self is log:
+			if not _isIOEnabled:
+				return
+		elif not self.isEnabledFor(self.IO):
 			return
 		self._log(log.IO, msg, args, **kwargs)
 
@@ -335,8 +488,6 @@ def exception(self, msg: str = "", exc_info: Literal[True] | _excInfo_t | BaseEx
 		Normally, it will be logged at level "ERROR".
 		However, certain exceptions which aren't considered errors (or aren't errors that we can fix) are expected and will therefore be logged at a lower level.
 		"""
-		import comtypes
-
 		if exc_info is True:
 			exc_info = sys.exc_info()
 		if isinstance(exc_info, tuple):
@@ -345,30 +496,11 @@ def exception(self, msg: str = "", exc_info: Literal[True] | _excInfo_t | BaseEx
 			exc = exc_info
 
 		if (
-			(
-				isinstance(exc, WindowsError)
-				and exc.winerror
-				in (
-					ERROR_INVALID_WINDOW_HANDLE,
-					ERROR_TIMEOUT,
-					RPCConstants.RPC.S_SERVER_UNAVAILABLE,
-					RPCConstants.RPC.S_CALL_FAILED_DNE,
-					EPT_S_NOT_REGISTERED,
-					RPCConstants.RPC.E_CALL_CANCELED,
-				)
-			)
+			(isinstance(exc, WindowsError) and exc.winerror in _DEBUG_WARNING_WINERRORS)
 			or (
-				isinstance(exc, comtypes.COMError)
+				isinstance(exc, _getCOMErrorType())
 				and (
-					exc.hresult
-					in (
-						E_ACCESSDENIED,
-						CO_E_OBJNOTCONNECTED,
-						EVENT_E_ALL_SUBSCRIBERS_FAILED,
-						RPCConstants.RPC.E_CALL_REJECTED,
-						RPCConstants.RPC.E_CALL_CANCELED,
-						RPCConstants.RPC.E_DISCONNECTED,
-					)
+					exc.hresult in _DEBUG_WARNING_HRESULTS
 					or exc.hresult & 0xFFFF == RPCConstants.RPC.S_SERVER_UNAVAILABLE
 				)
 			)
@@ -394,11 +526,11 @@ def markFragmentStart(self):
 			or not isinstance(logHandler, FileHandler)
 		):
 			return False
-		with open(globalVars.appArgs.logFileName, "r", encoding="UTF-8") as f:
-			# _io.TextIOWrapper.seek: whence=2 -- end of stream
-			f.seek(0, 2)
-			self.fragmentStart = f.tell()
-			return True
+		# Once all pending records have been written, the end of the log file is its size in bytes,
+		# which is also the position expected by `seek` in L{getFragment}.
+		flushLogFile()
+		self.fragmentStart = os.path.getsize(globalVars.appArgs.logFileName)
+		return True
 
 	def getFragment(self):
 		"""Retrieve a fragment of the log starting from the position marked using
@@ -415,6 +547,7 @@ def getFragment(self):
 			or not isinstance(logHandler, FileHandler)
 		):
 			return None
+		flushLogFile()
 		with open(globalVars.appArgs.logFileName, "r", encoding="UTF-8") as f:
 			f.seek(self.fragmentStart)
 			fragment = f.read()
@@ -436,18 +569,82 @@ def __init__(self):
 			winKernel.LOAD_WITH_ALTERED_SEARCH_PATH,
 		)
 		self._remoteLib = ctypes.CDLL("nvdaHelperRemote", handle=h)
+		# Resolve the function and its prototype once, rather than on every emitted record.
+		logMessage = self._remoteLib.nvdaControllerInternal_logMessage
+		logMessage.argtypes = (ctypes.c_long, ctypes.c_long, ctypes.c_wchar_p)
+		logMessage.restype = ctypes.c_ulong
+		self._logMessage = logMessage
+		self._pid: int = globalVars.appPid
 		logging.Handler.__init__(self)
 
 	def emit(self, record):
 		msg = self.format(record)
 		try:
-			self._remoteLib.nvdaControllerInternal_logMessage(record.levelno, globalVars.appPid, msg)
+			self._logMessage(record.levelno, self._pid, msg)
 		except WindowsError:
 			pass
 
 
 class FileHandler(logging.FileHandler):
-	def handle(self, record):
+	"""Writes log records to the NVDA log file.
+	Writes are buffered; the file is only flushed after records at level ERROR or above,
+	or when explicitly requested (see L{_LogFileWriter} and L{flushLogFile}).
+	"""
+
+	def _open(self):
+		return open(
+			self.baseFilename,
+			self.mode,
+			encoding=self.encoding,
+			errors=self.errors,
+			buffering=_LOG_FILE_BUFFER_SIZE,
+		)
+
+	def emit(self, record: logging.LogRecord) -> None:
+		if self.stream is None:
+			# The handler has been closed.
+			return
+		try:
+			self.stream.write(self.format(record) + self.terminator)
+			if record.levelno >= logging.ERROR:
+				self.flush()
+		except RecursionError:
+			raise
+		except Exception:
+			self.handleError(record)
+
+	def handleError(self, record: logging.LogRecord) -> None:
+		"""Reports a failure to write the log file to the original standard error stream, if there is one.
+		`sys.stderr` is redirected to the log (see L{redirectStdout}),
+		so reporting the failure there would log it again, and writing that would most likely fail again.
+		"""
+		stream = sys.__stderr__
+		if not logging.raiseExceptions or stream is None:
+			return
+		try:
+			stream.write(f"--- Logging error ---\n{traceback.format_exc()}Message: {record.msg!r}\n")
+		except Exception:
+			pass
+
+
+class _LogQueueHandler(logging.handlers.QueueHandler):
+	"""Queues log records to be written to the log file by a L{_LogFileWriter}.
+	The message and any exception of a record are formatted on the logging thread,
+	as formatting arguments may only be valid on that thread (e.g. COM objects).
+	"""
+
+	def createLock(self) -> None:
+		# Emitting only formats the record and puts it on a thread safe queue,
+		# so there is nothing to serialize and no lock needs to be taken for every record.
+		self.lock = contextlib.nullcontext()
+
+	def acquire(self) -> None:
+		pass
+
+	def release(self) -> None:
+		pass
+
+	def handle(self, record: logging.LogRecord) -> bool:
 		if record.levelno >= logging.CRITICAL:
 			winsound.MessageBeep(winsound.MB_ICONHAND)
 		elif record.levelno >= logging.ERROR and shouldPlayErrorSound():
@@ -455,40 +652,152 @@ def handle(self, record):
 		return super().handle(record)
 
 
+class _LogFileWriter(logging.handlers.QueueListener):
+	"""Writes queued log records to the log file on a background thread.
+	The log file is flushed whenever the queue has been drained,
+	so bursts of records are written with few flushes, while the file is kept up to date when NVDA is idle.
+	"""
+
+	def start(self) -> None:
+		super().start()
+		self._thread.name = "logFileWriter"
+
+	def handle(self, record: logging.LogRecord | threading.Event) -> None:
+		if isinstance(record, threading.Event):
+			# A flush was requested by L{flush}.
+			try:
+				self._flushHandlers()
+			finally:
+				record.set()
+			return
+		try:
+			super().handle(record)
+			if self.queue.empty():
+				self._flushHandlers(record)
+		except Exception:
+			# An exception escaping here would silently end this thread,
+			# after which records would pile up in the queue and every flush would wait for L{_FLUSH_TIMEOUT}.
+			# Records which are already queued are still written by this thread,
+			# but new records are written on the threads logging them from now on.
+			_writeLogFileSynchronously()
+			for handler in self.handlers:
+				handler.handleError(record)
+
+	def _flushHandlers(self, record: logging.LogRecord | None = None) -> None:
+		"""Flushes all handlers.
+		:param record: The record which was written last, if the flush wasn't explicitly requested.
+		"""
+		for handler in self.handlers:
+			_flushHandler(handler, record)
+
+	def flush(self) -> None:
+		"""Waits until all records queued so far have been written, then flushes the log file."""
+		if self._thread is None or threading.current_thread() is self._thread:
+			self._flushHandlers()
+			return
+		flushed = threading.Event()
+		self.queue.put_nowait(flushed)
+		flushed.wait(_FLUSH_TIMEOUT)
+
+
+def _ensureCodepath(record: logging.LogRecord) -> str:
+	"""Ensures that a record has a codepath: a clean and friendly module.class.function string
+	describing where it was logged.
+	NVDA's log calls provide / generate this.
+	However, as NVDA's logger is also installed as the root logger to catch logging from other libraries,
+	log calls outside of NVDA will not provide codepath.
+	#14315: In that case, make up a simple one from standard record attributes we know will exist,
+	and store it on the record so that format strings can refer to it.
+	:param record: The record being formatted.
+	:return: The codepath of the record.
+	"""
+	codepath = record.__dict__.get("codepath")
+	if codepath is None:
+		codepath = record.codepath = f"{record.name}.{record.funcName}"
+	return codepath
+
+
 class Formatter(logging.Formatter):
 	default_time_format = "%H:%M:%S"
 	default_msec_format = "%s.%03d"
+	#: The second (as seconds since the epoch) and its local time as formatted by L{formatTime} for the most recent record.
+	#: Stored as a single tuple so that both parts are always read and replaced together.
+	_lastFormattedSecond: tuple[int, str] = (-1, "")
+
+	def formatException(self, ex: _excInfo_t) -> str:
+		# Only the innermost frames are kept for very deep tracebacks, as that is where the error occurred.
+		# Source lines are looked up lazily, only for the frames which are actually formatted.
+		tbException = traceback.TracebackException(
+			*ex,
+			limit=-_TRACEBACK_LIMIT,
+			lookup_lines=False,
+			capture_locals=False,
+			compact=True,
+		)
+		return stripBasePathFromTracebackText("".join(tbException.format()).removesuffix("\n"))
 
-	def formatException(self, ex):
-		return stripBasePathFromTracebackText(super(Formatter, self).formatException(ex))
-
-	def format(self, record: logging.LogRecord) -> str:
-		# NVDA's log calls provide / generate a special 'codepath' record attribute.
-		# Which is a clean and friendly module.class.function string.
-		# However, as NVDA's logger is also installed as the root logger to catch logging from other libraries,
-		# log calls outside of NVDA will not provide codepath.
-		if not hasattr(record, "codepath"):
-			# #14315: codepath was not provided,
-			# So make up a simple one from standard record attributes we know will exist.
-			record.codepath = "{name}.{funcName}".format(**record.__dict__)
-		return super().format(record)
+	def formatMessage(self, record: logging.LogRecord) -> str:
+		_ensureCodepath(record)
+		return super().formatMessage(record)
 
 	def formatTime(self, record: logging.LogRecord, datefmt: str | None = None) -> str:
 		"""Custom implementation of `formatTime` which avoids `time.localtime`
 		since it causes a crash under some versions of Universal CRT when Python locale
 		is set to a Unicode one (#12160, Python issue 36792)
+		The local time is only converted once per second, as records are usually logged in bursts.
 		"""
-		timeAsFileTime = winKernel.time_tToFileTime(record.created)
-		timeAsSystemTime = winBindings.kernel32.SYSTEMTIME()
-		winKernel.FileTimeToSystemTime(timeAsFileTime, timeAsSystemTime)
-		timeAsLocalTime = winBindings.kernel32.SYSTEMTIME()
-		winKernel.SystemTimeToTzSpecificLocalTime(None, timeAsSystemTime, timeAsLocalTime)
-		res = f"{timeAsLocalTime.wHour:02d}:{timeAsLocalTime.wMinute:02d}:{timeAsLocalTime.wSecond:02d}"
+		second = int(record.created)
+		lastSecond, res = self._lastFormattedSecond
+		if second != lastSecond:
+			timeAsFileTime = winKernel.time_tToFileTime(second)
+			timeAsSystemTime = winBindings.kernel32.SYSTEMTIME()
+			winKernel.FileTimeToSystemTime(timeAsFileTime, timeAsSystemTime)
+			timeAsLocalTime = winBindings.kernel32.SYSTEMTIME()
+			winKernel.SystemTimeToTzSpecificLocalTime(None, timeAsSystemTime, timeAsLocalTime)
+			res = f"{timeAsLocalTime.wHour:02d}:{timeAsLocalTime.wMinute:02d}:{timeAsLocalTime.wSecond:02d}"
+			self._lastFormattedSecond = (second, res)
 		return self.default_msec_format % (res, record.msecs)
 
 
+class _FileFormatter(Formatter):
+	"""Formats records for NVDA's log file.
+	The message is built directly rather than via the generic format string machinery,
+	as this is done for every record written to the log.
+	"""
+
+	# This produces log entries such as the following:
+	# IO - inputCore.InputManager.executeGesture (09:17:40.724) - Thread-5 (13576):
+	# Input: kb(desktop):v
+	_FORMAT = "{levelname!s} - {codepath!s} ({asctime}) - {threadName} ({thread}):\n{message}"
+
+	def __init__(self):
+		# The format string is still passed so that L{usesTime} reports that asctime is needed.
+		super().__init__(fmt=self._FORMAT, style="{")
+
+	def formatMessage(self, record: logging.LogRecord) -> str:
+		return (
+			f"{record.levelname} - {_ensureCodepath(record)} ({record.asctime})"
+			f" - {record.threadName} ({record.thread}):\n{record.message}"
+		)
+
+
+class _RemoteFormatter(Formatter):
+	"""Formats records sent to a remote NVDA process by L{RemoteHandler}."""
+
+	_FORMAT = "{codepath!s}:\n{message}"
+
+	def __init__(self):
+		super().__init__(fmt=self._FORMAT, style="{")
+
+	def formatMessage(self, record: logging.LogRecord) -> str:
+		return f"{_ensureCodepath(record)}:\n{record.message}"
+
+
 class StreamRedirector(object):
-	"""Redirects an output stream to a logger."""
+	"""Redirects an output stream to a logger.
+	Text is buffered until a line is complete,
+	so that a line written in several fragments (e.g. by `print`) is logged as a single record.
+	"""
 
 	def __init__(self, name, logger, level):
 		"""Constructor.
@@ -501,16 +810,37 @@ def __init__(self, name, logger, level):
 		self.name = name
 		self.logger = logger
 		self.level = level
+		self._buffer: list[str] = []
+		self._bufferLock = threading.Lock()
 
 	def write(self, text):
+		if "\n" not in text:
+			with self._bufferLock:
+				self._buffer.append(text)
+			return
+		lastLineEnd = text.rindex("\n")
+		with self._bufferLock:
+			self._buffer.append(text[:lastLineEnd])
+			completeLines = "".join(self._buffer)
+			self._buffer.clear()
+			if lastLineEnd + 1 < len(text):
+				# Keep the incomplete final line until it is completed.
+				self._buffer.append(text[lastLineEnd + 1 :])
+		# Log outside of the lock, as logging errors may be written back to this stream.
+		self._log(completeLines)
+
+	def flush(self):
+		with self._bufferLock:
+			text = "".join(self._buffer)
+			self._buffer.clear()
+		self._log(text)
+
+	def _log(self, text: str) -> None:
 		text = text.rstrip()
 		if not text:
 			return
 		self.logger.log(self.level, text, codepath=self.name)
 
-	def flush(self):
-		pass
-
 
 def redirectStdout(logger):
 	"""Redirect stdout and stderr to a given logger.
@@ -521,6 +851,15 @@ def redirectStdout(logger):
 	sys.stderr = StreamRedirector("stderr", logger, logging.ERROR)
 
 
+def flushRedirectedStreams() -> None:
+	"""Logs any incomplete lines written to the redirected standard output and error streams.
+	These are otherwise only logged once the line is completed or the stream is flushed.
+	"""
+	for stream in (sys.stdout, sys.stderr):
+		if isinstance(stream, StreamRedirector):
+			stream.flush()
+
+
 NVDA_LOGGER_NAME = "nvda"
 # Register our logging class as the class for all loggers.
 logging.setLoggerClass(Logger)
@@ -530,6 +869,98 @@ def redirectStdout(logger):
 logHandler: logging.Handler | None = None
 
 
+def _updateLevelFlags() -> None:
+	"""Updates the cached flags used to skip disabled debug log calls on L{log}.
+	Must be called whenever the level of L{log} or the root logger changes.
+	"""
+	global _isDebugEnabled, _isIOEnabled, _isDebugWarningEnabled
+	_isDebugEnabled = log.isEnabledFor(Logger.DEBUG)
+	_isIOEnabled = log.isEnabledFor(Logger.IO)
+	_isDebugWarningEnabled = log.isEnabledFor(Logger.DEBUGWARNING)
+
+
+_updateLevelFlags()
+
+
+_logQueueHandler: _LogQueueHandler | None = None
+"""Handler queueing records for L{_logFileWriter}, installed on the root logger when logging to a file."""
+_logFileWriter: _LogFileWriter | None = None
+"""Writes records queued by L{_logQueueHandler} to L{logHandler} on a background thread."""
+
+
+def _flushHandler(handler: logging.Handler, record: logging.LogRecord | None = None) -> None:
+	"""Flushes a handler, reporting failures (e.g. a full disk) through L{logging.Handler.handleError}.
+	An exception must not escape, as it would stop the thread writing the log file,
+	after which records would pile up in its queue and every L{flushLogFile} would wait for L{_FLUSH_TIMEOUT}.
+	:param handler: The handler to flush.
+	:param record: The record which was written last, if any.
+	"""
+	try:
+		handler.flush()
+	except RecursionError:
+		raise
+	except Exception:
+		if record is None:
+			record = logging.makeLogRecord({"msg": "Flushing the log file"})
+		handler.handleError(record)
+
+
+def flushLogFile() -> None:
+	"""Ensures all records logged so far have been written to the log file,
+	so that they can be read back from disk, e.g. by the log viewer.
+	"""
+	if _logFileWriter is not None:
+		_logFileWriter.flush()
+	elif isinstance(logHandler, FileHandler):
+		_flushHandler(logHandler)
+
+
+def _startLogFileWriter(fileHandler: FileHandler) -> _LogQueueHandler:
+	"""Starts writing records to the log file on a background thread.
+	:param fileHandler: The handler writing to the log file.
+	:return: The handler which queues records for the background thread.
+	"""
+	global _logQueueHandler, _logFileWriter
+	logQueue = queue.SimpleQueue()
+	_logQueueHandler = _LogQueueHandler(logQueue)
+	# The message and exception are formatted before queueing,
+	# the full log entry is formatted by fileHandler on the background thread.
+	_logQueueHandler.setFormatter(Formatter(fmt="{message}", style="{"))
+	_logFileWriter = _LogFileWriter(logQueue, fileHandler, respect_handler_level=True)
+	_logFileWriter.start()
+	atexit.register(_stopLogFileWriter)
+	return _logQueueHandler
+
+
+def _stopLogFileWriter() -> None:
+	"""Writes all pending records, then stops the background thread.
+	Records logged afterwards, e.g. during interpreter shutdown, are written synchronously.
+	"""
+	global _logFileWriter
+	if _logFileWriter is None:
+		return
+	# The interpreter only flushes the standard streams after exit functions have run,
+	# when the log file has been closed.
+	flushRedirectedStreams()
+	_logFileWriter.stop()
+	_logFileWriter = None
+	_writeLogFileSynchronously()
+
+
+def _writeLogFileSynchronously() -> None:
+	"""Makes the root logger write records to L{logHandler} directly,
+	rather than queueing them for L{_logFileWriter}.
+	"""
+	global _logQueueHandler
+	if _logQueueHandler is None:
+		return
+	for logFilter in _logQueueHandler.filters:
+		logHandler.addFilter(logFilter)
+	log.root.addHandler(logHandler)
+	log.root.removeHandler(_logQueueHandler)
+	_logQueueHandler = None
+
+
 def _getDefaultLogFilePath():
 	if NVDAState.isRunningAsSource():
 		return os.path.join(globalVars.appDir, "nvda.log")
@@ -543,6 +974,104 @@ def _excepthook(*exc_info):
 	log.exception(exc_info=exc_info, codepath="unhandled exception")
 
 
+_REPEATED_EXCEPTION_LIMIT = 10
+"""Maximum number of identical exceptions logged per second by each exception hook."""
+_REPEATED_EXCEPTION_PERIOD = 1.0
+"""Period in seconds over which L{_REPEATED_EXCEPTION_LIMIT} applies."""
+
+
+def _getRaisingCode(tb: TracebackType | None) -> CodeType | None:
+	"""Returns the code object of the innermost frame of a traceback, i.e. the code which raised the exception."""
+	if tb is None:
+		return None
+	while tb.tb_next is not None:
+		tb = tb.tb_next
+	return tb.tb_frame.f_code
+
+
+class _RepeatedExceptionLimiter:
+	"""Limits how often identical exceptions are logged by an exception hook.
+	A faulty component (e.g. a broken COM object) may raise the same exception continuously,
+	which would otherwise flood the log and slow NVDA down.
+	Exceptions are considered identical if they are of the same type and were raised by the same code.
+	"""
+
+	def __init__(self, codepath: str):
+		"""
+		:param codepath: The code path used when logging how many exceptions were not logged.
+		"""
+		self._codepath = codepath
+		self._lock = threading.Lock()
+		self._periodStart = 0.0
+		self._counts: dict[tuple[type[BaseException], CodeType | None], int] = {}
+		self._reportTimer: threading.Timer | None = None
+
+	def shouldLog(self, excType: type[BaseException], excTraceback: TracebackType | None) -> bool:
+		"""Counts an exception and checks whether it should be logged."""
+		key = (excType, _getRaisingCode(excTraceback))
+		now = time.monotonic()
+		with self._lock:
+			if now - self._periodStart >= _REPEATED_EXCEPTION_PERIOD:
+				# The report timer may not have run yet.
+				suppressedCounts = self._endPeriod()
+				self._periodStart = now
+			else:
+				suppressedCounts = {}
+			count = self._counts[key] = self._counts.get(key, 0) + 1
+			if count == _REPEATED_EXCEPTION_LIMIT + 1 and self._reportTimer is None:
+				# Report how many exceptions were not logged as soon as the period ends.
+				self._reportTimer = threading.Timer(
+					self._periodStart + _REPEATED_EXCEPTION_PERIOD - now,
+					self._reportSuppressed,
+				)
+				self._reportTimer.daemon = True
+				self._reportTimer.start()
+		self._logSuppressedCounts(suppressedCounts)
+		if count == _REPEATED_EXCEPTION_LIMIT + 1:
+			log.warning(
+				f"{self._describe(key)} raised repeatedly, not logging further occurrences for up to a second",
+				codepath=self._codepath,
+			)
+		return count <= _REPEATED_EXCEPTION_LIMIT
+
+	def _endPeriod(self) -> dict[tuple[type[BaseException], CodeType | None], int]:
+		"""Ends the current period. Must be called with L{_lock} held.
+		:return: The number of exceptions which were not logged in the period, by type and raising code.
+		"""
+		if self._reportTimer is not None:
+			self._reportTimer.cancel()
+			self._reportTimer = None
+		suppressedCounts = {
+			key: count - _REPEATED_EXCEPTION_LIMIT
+			for key, count in self._counts.items()
+			if count > _REPEATED_EXCEPTION_LIMIT
+		}
+		self._counts.clear()
+		self._periodStart = 0.0
+		return suppressedCounts
+
+	def _reportSuppressed(self) -> None:
+		"""Called by the report timer once the period in which exceptions were not logged has ended."""
+		with self._lock:
+			suppressedCounts = self._endPeriod()
+		self._logSuppressedCounts(suppressedCounts)
+
+	def _logSuppressedCounts(self, suppressedCounts: dict[tuple[type[BaseException], CodeType | None], int]):
+		for key, count in suppressedCounts.items():
+			log.warning(
+				f"{count} repeated occurrences of {self._describe(key)} were not logged",
+				codepath=self._codepath,
+			)
+
+	@staticmethod
+	def _describe(key: tuple[type[BaseException], CodeType | None]) -> str:
+		"""Describes an exception by its type and the code which raised it."""
+		excType, code = key
+		if code is None:
+			return excType.__qualname__
+		return f"{excType.__qualname__} from {code.co_qualname} ({code.co_filename})"
+
+
 class _ThreadExceptHookArgs_t(NamedTuple):
 	exc_type: type[BaseException]
 	exc_value: BaseException | None
@@ -554,12 +1083,17 @@ def _threadExceptHook(excInfoObj: _ThreadExceptHookArgs_t) -> None:
 	if excInfoObj.exc_type is SystemExit:
 		# By default Python ignores `SystemExit` raised in threads, so we are going to follow suit.
 		return
+	if not _threadExceptionLimiter.shouldLog(excInfoObj.exc_type, excInfoObj.exc_traceback):
+		return
 	msg = ""
 	if excInfoObj.thread is not None:
 		msg = f"Exception in thread {excInfoObj.thread.name}:\n"
 	log.exception(msg, (excInfoObj.exc_type, excInfoObj.exc_value, excInfoObj.exc_traceback))
 
 
+_threadExceptionLimiter = _RepeatedExceptionLimiter("unhandled exception in thread")
+
+
 class _UnraisableHookArgs(Protocol):
 	exc_type: type[BaseException]
 	exc_value: BaseException | None
@@ -569,6 +1103,8 @@ class _UnraisableHookArgs(Protocol):
 
 
 def _unraisableExceptHook(unraisable: _UnraisableHookArgs) -> None:
+	if not _unraisableExceptionLimiter.shouldLog(unraisable.exc_type, unraisable.exc_traceback):
+		return
 	if unraisable.err_msg:
 		msg = f"{unraisable.err_msg}: {unraisable.object!r}"
 	else:
@@ -579,6 +1115,9 @@ def _unraisableExceptHook(unraisable: _UnraisableHookArgs) -> None:
 	)
 
 
+_unraisableExceptionLimiter = _RepeatedExceptionLimiter("unraisable exception")
+
+
 def _showwarning(message, category, filename, lineno, file=None, line=None):
 	log.debugWarning(
 		warnings.formatwarning(message, category, filename, lineno, line).rstrip(),
@@ -602,13 +1141,27 @@ def _shouldDisableLogging() -> bool:
 	return globalVars.appArgs.secure or noLoggingRequested
 
 
-def filterExternalDependencyLogging(record: logging.LogRecord) -> bool:
+_isExternalDependencyLoggingEnabled = True
+"""Whether records below level WARNING from loggers other than NVDA's are logged.
+Cached from the `debugLog.externalPythonDependencies` setting by L{updateExternalDependencyLoggingFromConfig},
+so that the configuration is not looked up for every record.
+Nothing is filtered until the configuration has been loaded.
+"""
+
+
+def updateExternalDependencyLoggingFromConfig() -> None:
+	"""Update whether external Python dependencies are logged below level WARNING, based on the current configuration."""
+	global _isExternalDependencyLoggingEnabled
 	import config
 
+	_isExternalDependencyLoggingEnabled = config.conf["debugLog"]["externalPythonDependencies"]
+
+
+def filterExternalDependencyLogging(record: logging.LogRecord) -> bool:
 	return (
 		record.name == NVDA_LOGGER_NAME
 		or record.levelno >= Logger.WARNING
-		or config.conf["debugLog"]["externalPythonDependencies"]
+		or _isExternalDependencyLoggingEnabled
 	)
 
 
@@ -620,18 +1173,17 @@ def initialize(shouldDoRemoteLogging=False):
 	@type shouldDoRemoteLogging: bool
 	"""
 	global log, logHandler
+	# NVDA's log format does not include the process or asyncio task,
+	# so avoid looking them up for every record.
+	logging.logProcesses = False
+	logging.logMultiprocessing = False
+	logging.logAsyncioTasks = False
 	logging.addLevelName(Logger.DEBUG_UNREDACTED, "DEBUG_UNREDACTED")
 	logging.addLevelName(Logger.DEBUGWARNING, "DEBUGWARNING")
 	logging.addLevelName(Logger.IO, "IO")
 	logging.addLevelName(Logger.OFF, "OFF")
 	if not shouldDoRemoteLogging:
-		# This produces log entries such as the following:
-		# IO - inputCore.InputManager.executeGesture (09:17:40.724) - Thread-5 (13576):
-		# Input: kb(desktop):v
-		logFormatter = Formatter(
-			fmt="{levelname!s} - {codepath!s} ({asctime}) - {threadName} ({thread}):\n{message}",
-			style="{",
-		)
+		logFormatter = _FileFormatter()
 		if _shouldDisableLogging():
 			logHandler = logging.NullHandler()
 			# There's no point in logging anything at all, since it'll go nowhere.
@@ -664,19 +1216,21 @@ def initialize(shouldDoRemoteLogging=False):
 			log.root.setLevel(logLevel)
 	else:
 		logHandler = RemoteHandler()
-		logFormatter = Formatter(
-			fmt="{codepath!s}:\n{message}",
-			style="{",
-		)
+		logFormatter = _RemoteFormatter()
 	logHandler.setFormatter(logFormatter)
-	logHandler.addFilter(filterExternalDependencyLogging)
-	log.root.addHandler(logHandler)
+	if isinstance(logHandler, FileHandler):
+		rootHandler = _startLogFileWriter(logHandler)
+	else:
+		rootHandler = logHandler
+	rootHandler.addFilter(filterExternalDependencyLogging)
+	log.root.addHandler(rootHandler)
 	redirectStdout(log)
 	sys.excepthook = _excepthook
 	sys.unraisablehook = _unraisableExceptHook
 	threading.excepthook = _threadExceptHook
 	warnings.showwarning = _showwarning
 	warnings.simplefilter("default", DeprecationWarning)
+	_updateLevelFlags()
 
 
 def isLogLevelForced() -> bool:
@@ -711,3 +1265,4 @@ def setLogLevelFromConfig():
 		level = log.INFO
 		config.conf["general"]["loggingLevel"] = logging.getLevelName(log.INFO)
 	log.root.setLevel(level)
+	_updateLevelFlags()
@@ -12,7 +12,7 @@
 from dataclasses import asdict, dataclass
 
 import NVDAState
-from logHandler import log, getFormattedStacksForAllThreads
+from logHandler import log, flushLogFile, flushRedirectedStreams, getFormattedStacksForAllThreads
 import core
 import globalVars
 import NVDAHelper
@@ -191,6 +191,8 @@ def crashHandler(exceptionInfo):
 	log.info(f"Listing stacks for Python threads:\n{stacks}")
 
 	_recordCrashTimestamp()
+	# Text written to stdout or stderr without a trailing newline has not been logged yet.
+	flushRedirectedStreams()
 	if globalVars.appArgs.secure:
 		# We cannot prevent crash loops in secure mode,
 		# so we should not automatically restart
@@ -199,4 +201,7 @@ def crashHandler(exceptionInfo):
 		log.info("Restarting due to crash")
 		# if NVDA has crashed we cannot rely on the queue handler to start the new NVDA instance
 		core.restartUnsafely()
+	# The process is terminated without running any exit code,
+	# so make sure the diagnostics logged above are written to the log file.
+	flushLogFile()
 	return 1  # EXCEPTION_EXECUTE_HANDLER
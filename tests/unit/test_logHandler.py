@@ -3,13 +3,21 @@
 # This file may be used under the terms of the GNU General Public License, version 2 or later, as modified by the NVDA license.
 # For full terms and any additional permissions, see the NVDA license file: https://github.com/nvaccess/nvda/blob/master/copying.txt
 
-"""Unit tests for secret redaction in the logHandler module."""
+"""Unit tests for the logHandler module."""
 
+import io
 import logging
+import os
+import queue
+import sys
+import tempfile
+import threading
+import traceback
 import types
 import unittest
 from unittest import mock
 
+import globalVars
 import logHandler
 
 
@@ -19,9 +27,18 @@ def setUp(self):
 		self.logger.setLevel(logging.INFO)
 		self.logger.parent = None
 
+	def _assertHandled(self, handle: mock.Mock, msg: str, args: tuple):
+		handle.assert_called_once()
+		record = handle.call_args.args[0]
+		self.assertEqual(record.levelno, logging.INFO)
+		self.assertEqual(record.msg, msg)
+		self.assertEqual(record.args, args)
+		self.assertIsNone(record.exc_info)
+		self.assertEqual(record.codepath, "tests.unit.test_logHandler")
+
 	def test_logWithoutRedactionPassesMessageAndArgsThrough(self):
 		with (
-			mock.patch.object(logging.Logger, "_log") as superLog,
+			mock.patch.object(self.logger, "handle") as handle,
 			mock.patch("detect_secrets.core.scan.scan_line") as scanLine,
 		):
 			self.logger._log(
@@ -32,19 +49,13 @@ def test_logWithoutRedactionPassesMessageAndArgsThrough(self):
 			)
 
 		scanLine.assert_not_called()
-		superLog.assert_called_once_with(
-			logging.INFO,
-			"api key %s",
-			("secret-value",),
-			None,
-			{"codepath": "tests.unit.test_logHandler"},
-		)
+		self._assertHandled(handle, "api key %s", ("secret-value",))
 
 	def test_logWithRedactionMasksDetectedSecrets(self):
 		secret = types.SimpleNamespace(secret_value="secret-value")
 
 		with (
-			mock.patch.object(logging.Logger, "_log") as superLog,
+			mock.patch.object(self.logger, "handle") as handle,
 			mock.patch(
 				"detect_secrets.core.scan.scan_line",
 				return_value=[secret],
@@ -59,17 +70,11 @@ def test_logWithRedactionMasksDetectedSecrets(self):
 			)
 
 		scanLine.assert_called_once_with("api key secret-value and again secret-value")
-		superLog.assert_called_once_with(
-			logging.INFO,
-			"api key **** and again ****",
-			(),
-			None,
-			{"codepath": "tests.unit.test_logHandler"},
-		)
+		self._assertHandled(handle, "api key **** and again ****", ())
 
 	def test_logWithRedactionFallsBackWhenFormattingFails(self):
 		with (
-			mock.patch.object(logging.Logger, "_log") as superLog,
+			mock.patch.object(self.logger, "handle") as handle,
 			mock.patch(
 				"detect_secrets.core.scan.scan_line",
 				return_value=[],
@@ -88,16 +93,10 @@ def test_logWithRedactionFallsBackWhenFormattingFails(self):
 			"Failed to format log message for secret redaction, logging unredacted exception.",
 		)
 		scanLine.assert_called_once_with("expected int %d")
-		superLog.assert_called_once_with(
-			logging.INFO,
-			"expected int %d",
-			(),
-			None,
-			{"codepath": "tests.unit.test_logHandler"},
-		)
+		self._assertHandled(handle, "expected int %d", ())
 
 	def test_logWithRealDetectSecretsMasksHash(self):
-		with mock.patch.object(logging.Logger, "_log") as superLog:
+		with mock.patch.object(self.logger, "handle") as handle:
 			self.logger._log(
 				logging.INFO,
 				"Config loaded: %s",
@@ -106,12 +105,12 @@ def test_logWithRealDetectSecretsMasksHash(self):
 				redactSecrets=True,
 			)
 
-		loggedMsg = superLog.call_args.args[1]
+		loggedMsg = handle.call_args.args[0].msg
 		self.assertIn("****", loggedMsg)
 		self.assertNotIn("86851a5bab3f33abc2858eca0922c34c34c38f0a", loggedMsg)
 
 	def test_logWithRealDetectSecretsCanRedactMultipleMessages(self):
-		with mock.patch.object(logging.Logger, "_log") as superLog:
+		with mock.patch.object(self.logger, "handle") as handle:
 			self.logger._log(
 				logging.INFO,
 				"first %s",
@@ -127,7 +126,7 @@ def test_logWithRealDetectSecretsCanRedactMultipleMessages(self):
 				redactSecrets=True,
 			)
 
-		loggedMessages = [call.args[1] for call in superLog.call_args_list]
+		loggedMessages = [call.args[0].msg for call in handle.call_args_list]
 		self.assertEqual(len(loggedMessages), 2)
 		for loggedMsg in loggedMessages:
 			self.assertIn("****", loggedMsg)
@@ -138,7 +137,7 @@ def test_logWithRedactionBypassesMaskingAtDebugUnredactedLevel(self):
 		self.logger.setLevel(logHandler.Logger.DEBUG_UNREDACTED)
 
 		with (
-			mock.patch.object(logging.Logger, "_log") as superLog,
+			mock.patch.object(self.logger, "handle") as handle,
 			mock.patch("detect_secrets.core.scan.scan_line", return_value=[secret]) as scanLine,
 		):
 			self.logger._log(
@@ -150,10 +149,409 @@ def test_logWithRedactionBypassesMaskingAtDebugUnredactedLevel(self):
 			)
 
 		scanLine.assert_not_called()
-		superLog.assert_called_once_with(
-			logging.INFO,
-			"api key %s",
-			("secret-value",),
-			None,
-			{"codepath": "tests.unit.test_logHandler"},
+		self._assertHandled(handle, "api key %s", ("secret-value",))
+
+
+class TestLoggerRecordCreation(unittest.TestCase):
+	def setUp(self):
+		self.logger = logHandler.Logger("testLogHandler")
+
+	def test_extraIsAddedToRecord(self):
+		with mock.patch.object(self.logger, "handle") as handle:
+			self.logger._log(logging.WARNING, "message", (), extra={"custom": 1}, codepath="some.codepath")
+		record = handle.call_args.args[0]
+		self.assertEqual(record.custom, 1)
+		self.assertEqual(record.codepath, "some.codepath")
+
+	def test_extraCannotOverwriteRecordAttributes(self):
+		for key in ("message", "asctime", "msg", "levelno"):
+			with self.subTest(key=key), mock.patch.object(self.logger, "handle") as handle:
+				with self.assertRaises(KeyError):
+					self.logger._log(logging.WARNING, "message", (), extra={key: "replaced"})
+				handle.assert_not_called()
+
+	def test_recordFactoryIsUsed(self):
+		defaultFactory = logging.getLogRecordFactory()
+
+		def factory(*args, **kwargs):
+			record = defaultFactory(*args, **kwargs)
+			record.fromFactory = True
+			return record
+
+		logging.setLogRecordFactory(factory)
+		self.addCleanup(logging.setLogRecordFactory, defaultFactory)
+		with mock.patch.object(self.logger, "handle") as handle:
+			self.logger._log(logging.WARNING, "message", ())
+		self.assertTrue(handle.call_args.args[0].fromFactory)
+
+
+class _CodePathBase:
+	def getFrame(self):
+		return sys._getframe()
+
+	@classmethod
+	def getClassFrame(cls):
+		return sys._getframe()
+
+
+class _CodePathDerived(_CodePathBase):
+	def getFrame(self):
+		return sys._getframe()
+
+
+class TestGetCodePath(unittest.TestCase):
+	def test_methodReportsDefiningClass(self):
+		codePath = logHandler.getCodePath(_CodePathDerived().getFrame())
+		self.assertTrue(codePath.endswith("._CodePathDerived.getFrame"), codePath)
+
+	def test_inheritedClassMethodReportsBaseClass(self):
+		codePath = logHandler.getCodePath(_CodePathDerived.getClassFrame())
+		self.assertTrue(codePath.endswith("._CodePathBase.getClassFrame"), codePath)
+
+	def test_overriddenMethodReportsBaseClassWhenCalledFromBase(self):
+		codePath = logHandler.getCodePath(_CodePathBase.getFrame(_CodePathDerived()))
+		self.assertTrue(codePath.endswith("._CodePathBase.getFrame"), codePath)
+		# The cached result for the derived class's own method must not be reused.
+		codePath = logHandler.getCodePath(_CodePathDerived().getFrame())
+		self.assertTrue(codePath.endswith("._CodePathDerived.getFrame"), codePath)
+
+
+class TestLogFileWriter(unittest.TestCase):
+	def setUp(self):
+		tempDir = tempfile.TemporaryDirectory()
+		self.addCleanup(tempDir.cleanup)
+		self.logFileName = os.path.join(tempDir.name, "nvda.log")
+		self.fileHandler = logHandler.FileHandler(self.logFileName, mode="w", encoding="utf-8")
+		self.addCleanup(self.fileHandler.close)
+		self.fileHandler.setFormatter(logging.Formatter("{levelname}: {message}", style="{"))
+		logQueue = queue.SimpleQueue()
+		self.writer = logHandler._LogFileWriter(logQueue, self.fileHandler)
+		self.writer.start()
+		self.addCleanup(self.writer.stop)
+		self.queueHandler = logHandler._LogQueueHandler(logQueue)
+		self.logger = logging.Logger("testLogFileWriter")
+		self.logger.addHandler(self.queueHandler)
+
+	def _readLogFile(self) -> str:
+		with open(self.logFileName, "r", encoding="utf-8") as f:
+			return f.read()
+
+	def test_flushWritesPendingRecords(self):
+		for i in range(100):
+			self.logger.warning("record %d", i)
+		self.writer.flush()
+		self.assertEqual(
+			self._readLogFile(),
+			"".join(f"WARNING: record {i}\n" for i in range(100)),
+		)
+
+	def test_messageIsFormattedOnLoggingThread(self):
+		class ThreadReporter:
+			def __str__(self):
+				return threading.current_thread().name
+
+		self.logger.warning("%s", ThreadReporter())
+		self.writer.flush()
+		self.assertEqual(self._readLogFile(), f"WARNING: {threading.current_thread().name}\n")
+
+	def test_failedFlushDoesNotStopWriter(self):
+		# As in NVDA, standard error is redirected to the log,
+		# so a failure reported there would be queued, fail to be written and be reported again.
+		stderrLogger = logHandler.Logger("stderr")
+		stderrLogger.addHandler(self.queueHandler)
+		realStderr = io.StringIO()
+		with (
+			mock.patch.object(
+				self.fileHandler.stream, "flush", side_effect=OSError(28, "No space left on device")
+			),
+			mock.patch.object(
+				sys, "stderr", logHandler.StreamRedirector("stderr", stderrLogger, logging.WARNING)
+			),
+			mock.patch.object(sys, "__stderr__", realStderr),
+		):
+			self.logger.warning("disk full")
+			# The flush request must be answered even though flushing failed.
+			self.writer.flush()
+			self.assertTrue(self.writer._thread.is_alive())
+			self.assertTrue(self.writer.queue.empty())
+		self.assertIn("No space left on device", realStderr.getvalue())
+		self.logger.warning("disk freed")
+		self.writer.flush()
+		self.assertTrue(self.writer._thread.is_alive())
+		self.assertEqual(self._readLogFile(), "WARNING: disk full\nWARNING: disk freed\n")
+
+	def test_writesSynchronouslyAfterUnexpectedError(self):
+		root = logging.getLogger()
+		root.addHandler(self.queueHandler)
+		self.addCleanup(root.removeHandler, self.queueHandler)
+		self.addCleanup(root.removeHandler, self.fileHandler)
+		with (
+			mock.patch.object(logHandler, "logHandler", self.fileHandler),
+			mock.patch.object(logHandler, "_logQueueHandler", self.queueHandler),
+			mock.patch.object(sys, "__stderr__", io.StringIO()),
+			mock.patch.object(self.fileHandler, "emit", side_effect=RecursionError),
+		):
+			self.logger.warning("unexpected")
+			self.writer.flush()
+			self.assertTrue(self.writer._thread.is_alive())
+			self.assertIn(self.fileHandler, root.handlers)
+			self.assertNotIn(self.queueHandler, root.handlers)
+
+
+class TestIsPathExternalToNVDA(unittest.TestCase):
+	def setUp(self):
+		logHandler._resetPathCaches()
+		self.addCleanup(logHandler._resetPathCaches)
+
+	def test_configDirIsReclassifiedAfterReset(self):
+		configDir = os.path.join(logHandler._NVDA_CODE_PATH, "userConfig")
+		path = os.path.join(configDir, "scratchpad", "globalPlugins", "plugin.py")
+		with mock.patch.object(globalVars.appArgs, "configPath", None):
+			self.assertFalse(logHandler.isPathExternalToNVDA(path))
+		with mock.patch.object(globalVars.appArgs, "configPath", configDir):
+			# The cached classification is kept until the caches are reset.
+			self.assertFalse(logHandler.isPathExternalToNVDA(path))
+			logHandler._resetPathCaches()
+			self.assertTrue(logHandler.isPathExternalToNVDA(path))
+
+
+class TestLevelFlags(unittest.TestCase):
+	def setUp(self):
+		self.addCleanup(logHandler.log.setLevel, logHandler.log.level)
+
+	def test_ioSkippedWhenDisabled(self):
+		logHandler.log.setLevel(logHandler.Logger.INFO)
+		self.assertFalse(logHandler.log.isIOEnabled)
+		with mock.patch.object(logHandler.log, "_log") as logMock:
+			logHandler.log.io("input")
+			logHandler.log.debugWarning("warning")
+			logHandler.log.debug("debug")
+		logMock.assert_not_called()
+
+	def test_ioLoggedWhenEnabled(self):
+		logHandler.log.setLevel(logHandler.Logger.IO)
+		self.assertTrue(logHandler.log.isIOEnabled)
+		with mock.patch.object(logHandler.log, "_log") as logMock:
+			logHandler.log.io("input")
+			logHandler.log.debugWarning("warning")
+			logHandler.log.debug("debug")
+		self.assertEqual(
+			[call.args[0] for call in logMock.call_args_list],
+			[logHandler.Logger.IO, logHandler.Logger.DEBUGWARNING],
 		)
+
+
+class TestFormatterTime(unittest.TestCase):
+	def _makeRecord(self, created: float) -> logging.LogRecord:
+		record = logging.LogRecord("test", logging.INFO, "", 0, "", (), None)
+		record.created = created
+		record.msecs = int((created - int(created)) * 1000)
+		return record
+
+	def test_localTimeConvertedOncePerSecond(self):
+		formatter = logHandler.Formatter()
+		with (
+			mock.patch.object(logHandler.winKernel, "time_tToFileTime"),
+			mock.patch.object(logHandler.winKernel, "FileTimeToSystemTime"),
+			mock.patch.object(logHandler.winKernel, "SystemTimeToTzSpecificLocalTime") as toLocalTime,
+			mock.patch.object(
+				logHandler.winBindings.kernel32,
+				"SYSTEMTIME",
+				side_effect=lambda: types.SimpleNamespace(wHour=1, wMinute=2, wSecond=3),
+			),
+		):
+			self.assertEqual(formatter.formatTime(self._makeRecord(1000.25)), "01:02:03.250")
+			self.assertEqual(formatter.formatTime(self._makeRecord(1000.5)), "01:02:03.500")
+			self.assertEqual(toLocalTime.call_count, 1)
+			formatter.formatTime(self._makeRecord(1001.0))
+			self.assertEqual(toLocalTime.call_count, 2)
+
+
+class TestDefaultCodepath(unittest.TestCase):
+	def setUp(self):
+		self.formatter = logHandler.Formatter(fmt="{codepath}: {message}", style="{")
+
+	def _format(self, logger: logging.Logger, **kwargs) -> str:
+		with mock.patch.object(logger, "handle") as handle:
+			logger._log(logging.WARNING, "message", (), **kwargs)
+		return self.formatter.format(handle.call_args.args[0])
+
+	def test_defaultCodepathForExternalLoggers(self):
+		logger = logging.Logger("external")
+		self.assertEqual(self._format(logger), "external._format: message")
+
+	def test_codepathProvidedByNVDALogger(self):
+		logger = logHandler.Logger("nvdaLogger")
+		self.assertEqual(self._format(logger, codepath="some.codepath"), "some.codepath: message")
+
+	def test_defaultCodepathForRecordCreatedDirectly(self):
+		record = logging.LogRecord("external", logging.INFO, __file__, 1, "message", (), None, func="func")
+		self.assertEqual(self.formatter.format(record), "external.func: message")
+
+
+class TestFormatters(unittest.TestCase):
+	def _makeRecord(self) -> logging.LogRecord:
+		record = logging.LogRecord("nvda", logging.INFO, __file__, 1, "hello %s", ("world",), None)
+		record.codepath = "some.codepath"
+		return record
+
+	def _assertMatchesFormatString(self, formatter: logHandler.Formatter):
+		genericFormatter = logHandler.Formatter(fmt=formatter._FORMAT, style="{")
+		with mock.patch.object(logHandler.Formatter, "formatTime", return_value="01:02:03.004"):
+			self.assertEqual(
+				formatter.format(self._makeRecord()), genericFormatter.format(self._makeRecord())
+			)
+
+	def test_fileFormatter(self):
+		self._assertMatchesFormatString(logHandler._FileFormatter())
+
+	def test_remoteFormatter(self):
+		self._assertMatchesFormatString(logHandler._RemoteFormatter())
+
+
+class TestFormatException(unittest.TestCase):
+	def test_deepTracebackKeepsInnermostFrames(self):
+		def recurse(depth: int):
+			if depth == 0:
+				raise ValueError("innermost")
+			recurse(depth - 1)
+
+		try:
+			recurse(logHandler._TRACEBACK_LIMIT * 2)
+		except ValueError:
+			text = logHandler.Formatter().formatException(sys.exc_info())
+		self.assertTrue(text.startswith("Traceback (most recent call last):\n"), text)
+		self.assertTrue(text.endswith("ValueError: innermost"), text)
+		self.assertIn('raise ValueError("innermost")', text)
+		self.assertNotIn("test_deepTracebackKeepsInnermostFrames", text)
+
+
+class TestGetFormattedStacksForAllThreads(unittest.TestCase):
+	def test_currentThreadStackMatchesFormatStack(self):
+		stacks = logHandler.getFormattedStacksForAllThreads()
+		thread = threading.current_thread()
+		header = f"Python stack for thread {thread.ident} ({thread.name}):\n"
+		self.assertIn(header, stacks)
+		currentStack = stacks.split(header, 1)[1]
+		# The frames calling this test method are identical.
+		expectedFrames = "".join(traceback.format_stack()[:-1])
+		self.assertTrue(currentStack.startswith(expectedFrames))
+		self.assertIn("in getFormattedStacksForAllThreads", currentStack)
+
+
+class TestStreamRedirector(unittest.TestCase):
+	def setUp(self):
+		self.logger = mock.Mock()
+		self.redirector = logHandler.StreamRedirector("stderr", self.logger, logging.ERROR)
+
+	def _loggedTexts(self) -> list[str]:
+		return [call.args[1] for call in self.logger.log.call_args_list]
+
+	def test_printWithSeveralArgumentsLogsOneRecord(self):
+		print("a", "b", file=self.redirector)
+		self.assertEqual(self._loggedTexts(), ["a b"])
+		self.logger.log.assert_called_once_with(logging.ERROR, "a b", codepath="stderr")
+
+	def test_incompleteLineLoggedOnFlush(self):
+		self.redirector.write("first\nsecond")
+		self.assertEqual(self._loggedTexts(), ["first"])
+		self.redirector.flush()
+		self.assertEqual(self._loggedTexts(), ["first", "second"])
+
+	def test_multipleLinesInOneWriteLogOneRecord(self):
+		self.redirector.write("first\nsecond\n")
+		self.redirector.flush()
+		self.assertEqual(self._loggedTexts(), ["first\nsecond"])
+
+	def test_flushRedirectedStreamsLogsIncompleteLine(self):
+		self.redirector.write("no newline")
+		with mock.patch.object(sys, "stderr", self.redirector):
+			logHandler.flushRedirectedStreams()
+		self.assertEqual(self._loggedTexts(), ["no newline"])
+
+
+class TestExceptionLevel(unittest.TestCase):
+	def setUp(self):
+		self.logger = logHandler.Logger("testExceptionLevel")
+		self.logger.setLevel(logging.DEBUG)
+		self.logger.parent = None
+
+	def _loggedLevel(self, exc: BaseException) -> int:
+		with mock.patch.object(self.logger, "_log") as logMock:
+			self.logger.exception(exc_info=exc)
+		return logMock.call_args.args[0]
+
+	def test_expectedWindowsErrorLoggedAsDebugWarning(self):
+		exc = OSError()
+		exc.winerror = logHandler.ERROR_TIMEOUT
+		self.assertEqual(self._loggedLevel(exc), logHandler.Logger.DEBUGWARNING)
+
+	def test_unexpectedErrorLoggedAsError(self):
+		self.assertEqual(self._loggedLevel(ValueError()), logHandler.Logger.ERROR)
+
+
+class TestExternalDependencyLogging(unittest.TestCase):
+	def _isHandled(self, loggerName: str, level: int) -> bool:
+		logger = logHandler.Logger(loggerName)
+		with (
+			mock.patch.object(logHandler, "_isExternalDependencyLoggingEnabled", False),
+			mock.patch.object(logger, "handle") as handle,
+		):
+			logger._log(level, "message", (), codepath="tests.unit.test_logHandler")
+		return handle.called
+
+	def test_externalInfoSkipped(self):
+		self.assertFalse(self._isHandled("external", logging.INFO))
+
+	def test_externalWarningLogged(self):
+		self.assertTrue(self._isHandled("external", logging.WARNING))
+
+	def test_nvdaInfoLogged(self):
+		self.assertTrue(self._isHandled(logHandler.NVDA_LOGGER_NAME, logging.INFO))
+
+
+class TestRepeatedExceptionLimiter(unittest.TestCase):
+	def _raise(self) -> types.TracebackType:
+		try:
+			raise ValueError
+		except ValueError as e:
+			return e.__traceback__
+
+	def test_identicalExceptionsLimitedPerSecond(self):
+		limiter = logHandler._RepeatedExceptionLimiter("test")
+		tb = self._raise()
+		with (
+			mock.patch("time.monotonic", return_value=100.0),
+			mock.patch("threading.Timer") as timer,
+			mock.patch.object(logHandler.log, "warning") as logWarning,
+		):
+			results = [
+				limiter.shouldLog(ValueError, tb) for _ in range(logHandler._REPEATED_EXCEPTION_LIMIT + 5)
+			]
+			self.assertEqual(results.count(True), logHandler._REPEATED_EXCEPTION_LIMIT)
+			# A different exception is still logged.
+			self.assertTrue(limiter.shouldLog(KeyError, tb))
+			logWarning.assert_called_once()
+			timer.assert_called_once_with(logHandler._REPEATED_EXCEPTION_PERIOD, limiter._reportSuppressed)
+			# The suppressed exceptions are reported when the period ends.
+			limiter._reportSuppressed()
+			self.assertEqual(logWarning.call_count, 2)
+			message = logWarning.call_args.args[0]
+			self.assertIn("5 repeated occurrences of ValueError", message)
+			self.assertIn(self._raise.__qualname__, message)
+			self.assertTrue(limiter.shouldLog(ValueError, tb))
+
+	def test_suppressedExceptionsReportedAfterPeriodIfTimerHasNotRun(self):
+		limiter = logHandler._RepeatedExceptionLimiter("test")
+		tb = self._raise()
+		with (
+			mock.patch("time.monotonic", return_value=100.0) as monotonic,
+			mock.patch("threading.Timer") as timer,
+			mock.patch.object(logHandler.log, "warning") as logWarning,
+		):
+			for _ in range(logHandler._REPEATED_EXCEPTION_LIMIT + 5):
+				limiter.shouldLog(ValueError, tb)
+			monotonic.return_value = 101.0
+			self.assertTrue(limiter.shouldLog(ValueError, tb))
+			timer.return_value.cancel.assert_called_once()
+			self.assertIn("5 repeated occurrences of ValueError", logWarning.call_args.args[0])